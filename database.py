@@ -0,0 +1,221 @@
+# database.py
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from turnover import calcola_turnover, etichette_mesi
+
+# Ancorato al modulo: lo stesso database indipendentemente dalla cartella da cui parte Streamlit
+PERCORSO_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "infratel.db")
+DIMENSIONE_POOL = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movimenti (
+    mese TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    costo INTEGER NOT NULL,
+    ricavo INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_movimenti_mese ON movimenti (mese, costo, ricavo);
+DROP INDEX IF EXISTS idx_movimenti_categoria;
+CREATE INDEX IF NOT EXISTS idx_movimenti_mese_categoria ON movimenti (mese, categoria, costo);
+
+CREATE TABLE IF NOT EXISTS eventi_dipendenti (
+    dipartimento TEXT NOT NULL,
+    data_assunzione TEXT NOT NULL,
+    data_uscita TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_eventi_uscita ON eventi_dipendenti (data_uscita);
+
+CREATE TABLE IF NOT EXISTS commesse (
+    progetto TEXT PRIMARY KEY,
+    budget INTEGER NOT NULL,
+    avanzamento INTEGER NOT NULL,
+    data_scadenza TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS spese_commesse (
+    progetto TEXT NOT NULL REFERENCES commesse (progetto),
+    importo INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_spese_progetto ON spese_commesse (progetto, importo);
+"""
+
+# Un pool per file di database, condiviso tra i rerun e le sessioni Streamlit (stesso processo)
+_pool = {}
+_pool_lock = threading.Lock()
+_init_lock = threading.Lock()
+_inizializzati = set()
+
+
+def _crea_connessione(percorso):
+    conn = sqlite3.connect(percorso, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+@contextmanager
+def connessione(percorso=PERCORSO_DB):
+    with _pool_lock:
+        if percorso not in _pool:
+            # Le connessioni vengono aperte solo al primo utilizzo (None = slot libero non ancora aperto)
+            _pool[percorso] = queue.LifoQueue()
+            for _ in range(DIMENSIONE_POOL):
+                _pool[percorso].put(None)
+        libere = _pool[percorso]
+
+    conn = libere.get()
+    try:
+        if conn is None:
+            conn = _crea_connessione(percorso)
+        yield conn
+    finally:
+        if conn is not None:
+            # Nessuna transazione aperta deve passare al prossimo utilizzatore
+            conn.rollback()
+        libere.put(conn)
+
+
+def _ripartisci(totale, n):
+    # Suddivide un importo intero in n quote intere casuali che sommano al totale
+    tagli = np.sort(np.random.randint(0, totale + 1, size=n - 1))
+    return np.diff(np.concatenate([[0], tagli, [totale]]))
+
+
+def _popola_demo(conn):
+    # Dati finanziari: 12 mesi, ogni mese suddiviso in più movimenti per categoria
+    categorie = ["Infrastrutture", "Consulenze", "Software", "Servizi Operativi", "Manutenzione"]
+    costi = np.random.randint(80000, 120000, size=12)
+    costi[5] = 200000  # Generiamo un'anomalia a Giugno
+    ricavi = costi + np.random.randint(10000, 30000, size=12)
+    movimenti = []
+    for i in range(12):
+        n_movimenti = 20
+        for costo, ricavo, categoria in zip(
+            _ripartisci(int(costi[i]), n_movimenti),
+            _ripartisci(int(ricavi[i]), n_movimenti),
+            np.random.choice(categorie, size=n_movimenti),
+        ):
+            movimenti.append((f"2025-{i + 1:02d}", str(categoria), int(costo), int(ricavo)))
+    conn.executemany("INSERT INTO movimenti VALUES (?, ?, ?, ?)", movimenti)
+
+    # Log assunzioni/uscite dei dipendenti
+    dipartimenti = ["Rete", "Progettazione", "Amministrazione", "Collaudi", "IT"]
+    n_dipendenti = 20000
+    data_assunzione = pd.Timestamp("2020-01-01") + pd.to_timedelta(np.random.randint(0, 6 * 365, size=n_dipendenti), unit="D")
+    data_uscita = data_assunzione + pd.to_timedelta(np.random.exponential(240, size=n_dipendenti).astype(int) + 1, unit="D")
+    data_uscita = pd.Series(data_uscita).where(data_uscita <= pd.Timestamp("2025-12-31"))
+    conn.executemany(
+        "INSERT INTO eventi_dipendenti VALUES (?, ?, ?)",
+        zip(
+            np.random.choice(dipartimenti, size=n_dipendenti).tolist(),
+            data_assunzione.strftime("%Y-%m-%d"),
+            [None if pd.isna(d) else d.strftime("%Y-%m-%d") for d in data_uscita],
+        ),
+    )
+
+    # Commesse con le singole voci di spesa
+    progetti = ['Progetto A', 'Progetto B', 'Progetto C', 'Progetto D']
+    budget = np.random.randint(200000, 500000, size=4)
+    costi_attuali = (budget * np.random.uniform(0.5, 1.2, size=4)).astype(int)
+    avanzamento = np.random.randint(30, 100, size=4)
+    data_scadenza = ['2025-06-30', '2025-09-30', '2025-12-31', '2025-11-15']
+    conn.executemany(
+        "INSERT INTO commesse VALUES (?, ?, ?, ?)",
+        zip(progetti, budget.tolist(), avanzamento.tolist(), data_scadenza),
+    )
+    for progetto, costo in zip(progetti, costi_attuali):
+        conn.executemany(
+            "INSERT INTO spese_commesse VALUES (?, ?)",
+            [(progetto, int(importo)) for importo in _ripartisci(int(costo), 50)],
+        )
+
+
+def inizializza_database(percorso=PERCORSO_DB):
+    # Crea schema e indici una sola volta per processo; al primo avvio popola il database con i dati dimostrativi
+    with _init_lock:
+        if percorso in _inizializzati:
+            return
+        with connessione(percorso) as conn:
+            conn.executescript(SCHEMA)
+            vuoto = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM movimenti)").fetchone()[0]
+            if vuoto:
+                with conn:
+                    _popola_demo(conn)
+        _inizializzati.add(percorso)
+
+
+def _finestra_mesi(inizio, fine):
+    return pd.Timestamp(inizio).strftime("%Y-%m"), pd.Timestamp(fine).strftime("%Y-%m")
+
+
+def leggi_costi_mensili(inizio, fine, percorso=PERCORSO_DB):
+    with connessione(percorso) as conn:
+        df = pd.read_sql_query(
+            'SELECT mese AS "Mese", SUM(costo) AS "Costi", SUM(ricavo) AS "Ricavi" '
+            "FROM movimenti WHERE mese BETWEEN ? AND ? GROUP BY mese ORDER BY mese",
+            conn,
+            params=_finestra_mesi(inizio, fine),
+        )
+    df["Mese"] = etichette_mesi(df["Mese"].tolist())
+    return df
+
+
+def leggi_costi_categorie(inizio, fine, percorso=PERCORSO_DB):
+    with connessione(percorso) as conn:
+        return pd.read_sql_query(
+            'SELECT categoria AS "Categoria", SUM(costo) AS "Costi" '
+            "FROM movimenti WHERE mese BETWEEN ? AND ? GROUP BY categoria ORDER BY categoria",
+            conn,
+            params=_finestra_mesi(inizio, fine),
+        )
+
+
+def leggi_turnover(inizio, fine, percorso=PERCORSO_DB, dimensione_blocco=100000):
+    # I dipendenti usciti prima della finestra non incidono sull'organico: vengono esclusi già in SQL.
+    # calcola_turnover lavora per mese, quindi il filtro usa i confini di mese e non i giorni
+    primo_giorno = pd.Timestamp(inizio).to_period("M").start_time
+    mese_successivo = (pd.Timestamp(fine).to_period("M") + 1).start_time
+    with connessione(percorso) as conn:
+        blocchi = pd.read_sql_query(
+            'SELECT dipartimento AS "Dipartimento", data_assunzione AS "Data Assunzione", '
+            '       data_uscita AS "Data Uscita" '
+            "FROM eventi_dipendenti "
+            "WHERE data_assunzione < ? AND (data_uscita IS NULL OR data_uscita >= ?)",
+            conn,
+            params=(mese_successivo.strftime("%Y-%m-%d"), primo_giorno.strftime("%Y-%m-%d")),
+            chunksize=dimensione_blocco,
+        )
+        return calcola_turnover(blocchi, inizio, fine)
+
+
+# Un progetto è a rischio se i costi attuali superano il 90% del budget
+_PREDICATO_A_RISCHIO = "COALESCE(SUM(s.importo), 0) > 0.9 * c.budget"
+
+_QUERY_COMMESSE = (
+    'SELECT c.progetto AS "Progetto", '
+    '       c.budget AS "Budget", '
+    '       COALESCE(SUM(s.importo), 0) AS "Costi Attuali", '
+    '       c.avanzamento AS "Avanzamento (%)", '
+    '       c.data_scadenza AS "Data Scadenza", '
+    f'       {_PREDICATO_A_RISCHIO} AS "A Rischio" '
+    "FROM commesse c "
+    "LEFT JOIN spese_commesse s ON s.progetto = c.progetto "
+    "GROUP BY c.progetto "
+)
+
+
+def leggi_commesse(solo_a_rischio=False, percorso=PERCORSO_DB):
+    query = _QUERY_COMMESSE
+    if solo_a_rischio:
+        query += f"HAVING {_PREDICATO_A_RISCHIO} "
+    query += "ORDER BY c.progetto"
+    with connessione(percorso) as conn:
+        df = pd.read_sql_query(query, conn, parse_dates=["Data Scadenza"])
+    df["A Rischio"] = df["A Rischio"].astype(bool)
+    return df
@@ -120,7 +120,7 @@ def genera_pdf_capitale_umano(df_turnover, df_turnover_pred, soglia_turnover, pr
     c.setFont("Helvetica", 12)
     turnover_medio = df_turnover["Turnover"].mean()
     c.drawString(100, height - 80, f"📊 Turnover Medio: {turnover_medio:.1f}%")
-    c.drawString(100, height - 100, f"📈 Turnover Totale (somma): {df_turnover['Turnover'].sum()}%")
+    c.drawString(100, height - 100, f"📈 Turnover Totale (somma): {df_turnover['Turnover'].sum():.1f}%")
 
     if (df_turnover["Turnover"] > soglia_turnover).any():
         c.drawString(100, height - 120, f"⚠️ Attenzione: Il turnover ha superato la soglia di {soglia_turnover}% in alcuni mesi!")
@@ -18,20 +18,27 @@ from helper import (
     salva_grafico_commesse,
     salva_grafico_previsione_turnover
 )
+from turnover import turnover_aziendale
+from database import (
+    inizializza_database,
+    leggi_costi_mensili,
+    leggi_costi_categorie,
+    leggi_turnover,
+    leggi_commesse
+)
 
 # -------------------------------
 # Parte 1: Analisi dei Dati Finanziari
 # -------------------------------
 np.random.seed(42)
-mesi = ["Gen", "Feb", "Mar", "Apr", "Mag", "Giu", "Lug", "Ago", "Set", "Ott", "Nov", "Dic"]
-costi = np.random.randint(80000, 120000, size=12)
-costi[5] = 200000  # Generiamo un'anomalia a Giugno
-ricavi = costi + np.random.randint(10000, 30000, size=12)
+inizializza_database()
 
-df = pd.DataFrame({"Mese": mesi, "Costi": costi, "Ricavi": ricavi})
-categorie = ["Infrastrutture", "Consulenze", "Software", "Servizi Operativi", "Manutenzione"]
-df["Categoria"] = np.random.choice(categorie, size=12)
-df_categorie = df.groupby("Categoria")["Costi"].sum().reset_index()
+# Totali mensili e ripartizione per categoria aggregati direttamente in SQLite
+df = leggi_costi_mensili("2025-01-01", "2025-12-31")
+df_categorie = leggi_costi_categorie("2025-01-01", "2025-12-31")
+if df.empty:
+    st.warning("Nessun dato finanziario disponibile per il periodo selezionato.")
+    st.stop()
 
 # Calcolo Z-Score per individuare anomalie
 df["Z-Score Costi"] = zscore(df["Costi"])
@@ -39,10 +46,10 @@ soglia_anomalia = 2
 anomalie = df[df["Z-Score Costi"].abs() > soglia_anomalia]
 
 # Analisi Predittiva sui Costi
-X = np.arange(1, 13).reshape(-1, 1)
+X = np.arange(1, len(df) + 1).reshape(-1, 1)
 y = df["Costi"].values
 modello = LinearRegression().fit(X, y)
-mesi_futuri = np.array([[13], [14], [15]])
+mesi_futuri = np.arange(len(df) + 1, len(df) + 4).reshape(-1, 1)
 previsione = modello.predict(mesi_futuri)
 df_pred = pd.DataFrame({
     "Mese": ["Gen 2026", "Feb 2026", "Mar 2026"],
@@ -96,14 +103,14 @@ st.download_button(
 # Parte 2: Analisi Turnover Dipendenti & Capitale Umano
 # -------------------------------
 st.title("👥 Analisi Turnover Dipendenti & Capitale Umano")
-turnover = np.random.randint(5, 21, size=12)
-df_turnover = pd.DataFrame({"Mese": mesi, "Turnover": turnover})
+df_turnover_dipartimenti = leggi_turnover("2025-01-01", "2025-12-31")
+df_turnover = turnover_aziendale(df_turnover_dipartimenti)
 soglia_turnover = 15
 
-X_turn = np.arange(1, 13).reshape(-1, 1)
+X_turn = np.arange(1, len(df_turnover) + 1).reshape(-1, 1)
 y_turn = df_turnover["Turnover"].values
 modello_turnover = LinearRegression().fit(X_turn, y_turn)
-mesi_futuri_turn = np.array([[13], [14], [15]])
+mesi_futuri_turn = np.arange(len(df_turnover) + 1, len(df_turnover) + 4).reshape(-1, 1)
 previsione_turnover = modello_turnover.predict(mesi_futuri_turn)
 df_turnover_pred = pd.DataFrame({
     "Mese": ["Gen 2026", "Feb 2026", "Mar 2026"],
@@ -118,6 +125,13 @@ ax.legend()
 plt.title("Turnover Mensile")
 st.pyplot(fig)
 
+st.subheader("🏢 Turnover per Dipartimento")
+st.dataframe(
+    df_turnover_dipartimenti
+    .pivot(index="Dipartimento", columns="Mese", values="Turnover")
+    .reindex(columns=df_turnover["Mese"])
+)
+
 st.subheader("📈 Previsione Turnover Futuro")
 fig, ax = plt.subplots(figsize=(6, 3))
 ax.plot(df_turnover["Mese"], df_turnover["Turnover"], label="Turnover Storico", marker="o")
@@ -147,19 +161,9 @@ st.download_button(
 # Parte 3: Monitoraggio Commesse e Collaudi
 # -------------------------------
 st.title("📌 Monitoraggio Commesse e Collaudi")
-progetti = ['Progetto A', 'Progetto B', 'Progetto C', 'Progetto D']
-budget = np.random.randint(200000, 500000, size=4)
-costi_attuali = budget * np.random.uniform(0.5, 1.2, size=4)
-avanzamento = np.random.randint(30, 100, size=4)
-data_scadenza = pd.to_datetime(['2025-06-30', '2025-09-30', '2025-12-31', '2025-11-15'])
-df_commesse = pd.DataFrame({
-    'Progetto': progetti,
-    'Budget': budget,
-    'Costi Attuali': costi_attuali.astype(int),
-    'Avanzamento (%)': avanzamento,
-    'Data Scadenza': data_scadenza
-})
-st.dataframe(df_commesse)
+# Il flag "A Rischio" è calcolato in SQL nella stessa query: una sola lettura per rerun
+df_commesse = leggi_commesse()
+st.dataframe(df_commesse.drop(columns="A Rischio"))
 
 fig, ax = plt.subplots(figsize=(6, 3))
 ax.bar(df_commesse['Progetto'], df_commesse['Budget'], label='Budget', alpha=0.6)
@@ -169,6 +173,5 @@ ax.legend()
 plt.title("Budget vs Costi Attuali")
 st.pyplot(fig)
 
-df_commesse['A Rischio'] = df_commesse['Costi Attuali'] > 0.9 * df_commesse['Budget']
 st.subheader("Progetti a Rischio")
 st.write(df_commesse[df_commesse['A Rischio']])
@@ -0,0 +1,104 @@
+# turnover.py
+import numpy as np
+import pandas as pd
+
+MESI = ["Gen", "Feb", "Mar", "Apr", "Mag", "Giu", "Lug", "Ago", "Set", "Ott", "Nov", "Dic"]
+
+
+def etichette_mesi(mesi):
+    # "Gen".."Dic"; se i mesi coprono più anni si aggiunge l'anno ("Gen 2025")
+    mesi_assoluti = np.asarray(mesi, dtype="datetime64[M]").astype(np.int64)
+    if len(mesi_assoluti) == 0:
+        return []
+    anni = 1970 + mesi_assoluti // 12
+    if anni.min() == anni.max():
+        return [MESI[m % 12] for m in mesi_assoluti]
+    return [f"{MESI[m % 12]} {a}" for m, a in zip(mesi_assoluti, anni)]
+
+
+def _indice_mese(date, mese_inizio):
+    # Converte le date in indice di mese relativo all'inizio della finestra (NaT -> non valido)
+    date = pd.to_datetime(date)
+    valide = date.notna().to_numpy()
+    indici = date.to_numpy().astype("datetime64[M]").astype(np.int64) - mese_inizio
+    return indici, valide
+
+
+def _conta_eventi(eventi, mese_inizio, n_mesi):
+    # Accetta un singolo DataFrame o un iterabile di blocchi (es. pd.read_csv(..., chunksize=...))
+    if isinstance(eventi, pd.DataFrame):
+        eventi = [eventi]
+
+    # Colonna 0: eventi precedenti alla finestra, 1..n_mesi: mesi della finestra, n_mesi + 1: scartati
+    n_colonne = n_mesi + 2
+    dipartimenti = {}
+    assunzioni = np.zeros((0, n_colonne), dtype=np.int64)
+    uscite = np.zeros((0, n_colonne), dtype=np.int64)
+
+    for blocco in eventi:
+        codici_locali, valori = pd.factorize(blocco["Dipartimento"])
+        # L'ultimo elemento della mappa assorbe i dipartimenti mancanti (codice -1), poi esclusi
+        mappa = np.array([dipartimenti.setdefault(v, len(dipartimenti)) for v in valori] + [0], dtype=np.int64)
+        codici = mappa[codici_locali]
+        con_dipartimento = codici_locali >= 0
+        if len(dipartimenti) > assunzioni.shape[0]:
+            nuove_righe = len(dipartimenti) - assunzioni.shape[0]
+            assunzioni = np.vstack([assunzioni, np.zeros((nuove_righe, n_colonne), dtype=np.int64)])
+            uscite = np.vstack([uscite, np.zeros((nuove_righe, n_colonne), dtype=np.int64)])
+
+        for colonna_data, griglia in (("Data Assunzione", assunzioni), ("Data Uscita", uscite)):
+            indici, valide = _indice_mese(blocco[colonna_data], mese_inizio)
+            valide = valide & con_dipartimento
+            colonne = np.clip(indici[valide], -1, n_mesi) + 1
+            griglia += np.bincount(
+                codici[valide] * n_colonne + colonne, minlength=griglia.size
+            ).reshape(griglia.shape)
+
+    return list(dipartimenti), assunzioni[:, :-1], uscite[:, :-1]
+
+
+def calcola_turnover(eventi, inizio, fine):
+    """
+    Turnover mensile per dipartimento a partire da un log di assunzioni/uscite.
+
+    `eventi` ha le colonne "Dipartimento", "Data Assunzione" e "Data Uscita"
+    (NaT per i dipendenti ancora in forza). Il turnover di un mese è il numero
+    di uscite diviso per l'organico medio tra inizio e fine mese, in percentuale.
+    """
+    mese_inizio = np.datetime64(pd.Timestamp(inizio), "M").astype(np.int64)
+    mese_fine = np.datetime64(pd.Timestamp(fine), "M").astype(np.int64)
+    n_mesi = int(mese_fine - mese_inizio) + 1
+
+    dipartimenti, assunzioni, uscite = _conta_eventi(eventi, mese_inizio, n_mesi)
+
+    # Organico a fine mese (colonna 0 = organico all'inizio della finestra)
+    organico = np.cumsum(assunzioni - uscite, axis=1)
+    organico_medio = (organico[:, :-1] + organico[:, 1:]) / 2
+    uscite_mese = uscite[:, 1:]
+    tasso = np.divide(
+        uscite_mese * 100, organico_medio,
+        out=np.zeros(organico_medio.shape), where=organico_medio > 0
+    )
+
+    etichette = etichette_mesi(mese_inizio + np.arange(n_mesi))
+
+    n_dipartimenti = len(dipartimenti)
+    return pd.DataFrame({
+        "Dipartimento": np.repeat(np.array(dipartimenti, dtype=object), n_mesi),
+        # Categorico: i mesi della finestra restano noti anche senza dipartimenti
+        "Mese": pd.Categorical(np.tile(np.array(etichette, dtype=object), n_dipartimenti), categories=etichette),
+        "Headcount Medio": organico_medio.ravel(),
+        "Uscite": uscite_mese.ravel(),
+        "Turnover": tasso.ravel().round(1),
+    })
+
+
+def turnover_aziendale(df_turnover_dipartimenti):
+    # Aggrega i dipartimenti nel formato usato dai grafici e dal report ("Mese", "Turnover");
+    # i mesi senza eventi (o un log vuoto) restano nella griglia con turnover 0
+    totali = df_turnover_dipartimenti.groupby("Mese", observed=False)[["Uscite", "Headcount Medio"]].sum()
+    turnover = np.divide(
+        totali["Uscite"].to_numpy() * 100, totali["Headcount Medio"].to_numpy(),
+        out=np.zeros(len(totali)), where=totali["Headcount Medio"].to_numpy() > 0
+    )
+    return pd.DataFrame({"Mese": totali.index.astype(object), "Turnover": turnover.round(1)})